@@ -1,13 +1,19 @@
-import json
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import requests
-from urllib.request import urlretrieve
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote, unquote
+import orjson
 from dotenv import load_dotenv
 from msal import ConfidentialClientApplication
 
 load_dotenv()
 
-class SharepointDownloader():
+class SharepointDownloader:
     """
     This class provides a reusable tool for connecting to SharePoint and manipulating dataframes sourced from it.
 
@@ -17,16 +23,45 @@ class SharepointDownloader():
         - SITE_NAME: This variable is set for each call, representing the SharePoint site to be accessed. Without it, the URL requesting (get() method) cannot proceed.
         - COMPANY_TENANT_ID: This variable sets the company tenant ID, similar to the initial part of the SharePoint URL (e.g., your_company.sharepoint.com).
 
-    The class provides five main functions:
-    1. get_token: Retrieves the header information required for each get() method.
+    The class provides six main functions:
+    1. get_token: Retrieves the header information required for each get() method, reusing it until the token is about to expire.
     2. get_response_id: Searches for the ID for every folder/file level, crucial for constructing the URL to be accessed.
-    3. get_drive_id: Retrieves the drive ID information from the first level of folders in the SharePoint library.
-    4. find_file: Searches for the desired file within each folder on the pipeline. It avoids looping the same search after finding each level of subfolder.
-    5. download_file: Initiates the entire pipeline. This method requires setting two variables:
+    3. get_drive_id: Retrieves the ID of the site's default document library, and the ID of the matched folder on its first level.
+    4. find_file: Searches for the desired file within each folder on the pipeline. The folders are listed level by level, batching up to 20 listings per request and sending the batches concurrently.
+    5. find_file_by_search: Searches for the desired file with the Graph search endpoint, in a single request.
+    6. download_file: Initiates the entire pipeline. This method requires setting two variables:
         - target_file_name: The name of the file, along with its type (e.g., 'file.xlsx' for Excel, 'file.csv' for CSV).
         - folder_match: The folder name to be matched, to find the root folder ID.
 
     """
+
+    # Maximum number of requests accepted by the Graph $batch endpoint in a single call
+    BATCH_SIZE = 20
+
+    # Statuses of $batch sub-requests that are queued again, waiting for their Retry-After, and how many times each folder is retried
+    RETRY_STATUSES = (429, 503, 504)
+    MAX_RETRIES = 5
+
+    # Number of $batch requests sent concurrently while walking the folders
+    MAX_WORKERS = 8
+
+    # Query appended to each folder listing, asking for the largest pages and only the fields used by the search
+    CHILDREN_QUERY = '/children?$top=999&$select=id,name,file,folder,@microsoft.graph.downloadUrl'
+
+    # Seconds to wait for each API response
+    REQUEST_TIMEOUT = 60
+
+    # File where the found file IDs and folder listings are kept between runs, for how many seconds each entry is trusted, and how many listings are kept
+    CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'sp_downloader.json')
+    CACHE_TTL = 24 * 60 * 60
+    CACHE_MAX_FOLDERS = 5000
+
+    # Size in bytes of each chunk written to disk while downloading the file
+    CHUNK_SIZE = 1 << 20
+
+    # Files from this size in bytes are downloaded as byte ranges, requested by this many concurrent connections
+    RANGE_DOWNLOAD_MIN_SIZE = 10 * (1 << 20)
+    DOWNLOAD_WORKERS = 8
     
     def __init__(self, company_tenant_id=None, client_id=None, client_secret=None, tenant_id=None, site_name=None) -> None:
         """
@@ -68,35 +103,236 @@ class SharepointDownloader():
             client_credential=self.CLIENT_SECRET
         )
         
-        # This variable is retrieved after the Env variableS "site name" and "company tenant (like your_company.sharepoint.com)" is set, dynamically searching the sharepoint site ID.
-        self.SHAREPOINT_SITE_ID = requests.get(f'https://graph.microsoft.com/v1.0/sites/{self.COMPANY_TENANT_ID}:/sites/{self.SITE_NAME}', headers=self.get_token()).json()['id']
-       
-        # This url is used at each request, as it is the main request url
-        self.url = f'https://graph.microsoft.com/v1.0/sites/{self.SHAREPOINT_SITE_ID}/drives/'
+        # A single session keeps the connections to the API alive, retrying transient failures and throttling
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET', 'HEAD', 'POST'])
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # GET requests still waiting for a response, shared by the callers requesting the same URL
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+        # The token and its authorization header are acquired on the first request, and kept until they are about to expire
+        self._headers = None
+        self._token_expiry = 0
+
+        # The sharepoint site ID, retrieved on its first use (see SHAREPOINT_SITE_ID)
+        self._site_id = None
+
+        # The ID of the site's default document library, retrieved on the first download
+        self._default_drive_id = None
+
+        # File IDs and folder listings found on previous runs are kept on disk, and written again only when they change
+        self._cache = self._load_cache()
+        self._cache_dirty = False
+
+        # Folder listings are requested through the JSON batching endpoint, which accepts up to 20 requests per call
+        self.batch_url = 'https://graph.microsoft.com/v1.0/$batch'
     
-    def get_token(self) -> None:
+    @property
+    def SHAREPOINT_SITE_ID(self) -> str:
+        """
+        The sharepoint site ID, dynamically searched from the "site name" and "company tenant (like your_company.sharepoint.com)" variables on its first use.
+
         """
-        Retrieves the authorization token required for API requests.
+        if not self._site_id:
+            site_response = self._get(f'https://graph.microsoft.com/v1.0/sites/{self.COMPANY_TENANT_ID}:/sites/{self.SITE_NAME}?$select=id')
+            self._site_id = orjson.loads(site_response.content)['id']
+        return self._site_id
+
+    @property
+    def url(self) -> str:
+        """
+        The main request url, used at each request.
+
+        """
+        return f'https://graph.microsoft.com/v1.0/sites/{self.SHAREPOINT_SITE_ID}/drives/'
+
+    def _refresh_token(self) -> None:
+        """
+        Acquires a new access token and stores its authorization header and expiry time.
+
+        """
+        result = self.app.acquire_token_for_client(scopes=self.scope)
+        access_token = result['access_token']
+        self._token_expiry = time.time() + result['expires_in'] - 60
+        # The JSON responses are requested compressed; the file downloads ask for 'identity' instead, as the files are usually compressed already.
+        self._headers = {'Authorization': 'Bearer ' + access_token, 'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'}
+
+    def get_token(self) -> dict:
+        """
+        Retrieves the authorization token required for API requests, acquiring a new one only when it is about to expire.
 
         Returns:
         - dict: A dictionary containing the authorization header.
 
         """
         try:
-            result = self.app.acquire_token_for_client(scopes=self.scope)
-            access_token = result['access_token']
-            headers = {'Authorization': 'Bearer ' + access_token}
-            return headers
+            if time.time() >= self._token_expiry:
+                self._refresh_token()
+            return self._headers
         
         except Exception as e:
             raise RuntimeError(f'Erro ao baixar arquivo: {e}')
+
+    def _send(self, method: str, url: str, headers=None, **kwargs):
+        """
+        Sends an authorized request to the API, refreshing the token and retrying once if it was rejected.
+
+        Args:
+        - method (str): The HTTP method of the request.
+        - url (str): The URL to be requested.
+        - headers (dict): Extra headers to be sent along with the authorization header.
+
+        Returns:
+        - requests.Response: The API response.
+
+        """
+        response = self.session.request(method, url, headers=dict(self.get_token(), **(headers or {})), timeout=self.REQUEST_TIMEOUT, **kwargs)
+        if response.status_code == 401:
+            self._refresh_token()
+            response = self.session.request(method, url, headers=dict(self._headers, **(headers or {})), timeout=self.REQUEST_TIMEOUT, **kwargs)
+        return response
+
+    def _get(self, url: str, **kwargs):
+        """
+        Sends an authorized GET request to the API. Concurrent requests for the same URL share a single response.
+
+        """
+        if kwargs:
+            return self._send('GET', url, **kwargs)
+
+        with self._inflight_lock:
+            future = self._inflight.get(url)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[url] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            response = self._send('GET', url)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[url]
+
+    def _post(self, url: str, **kwargs):
+        """
+        Sends an authorized POST request to the API.
+
+        """
+        return self._send('POST', url, **kwargs)
          
+    def _load_cache(self) -> dict:
+        """
+        Loads the file IDs and folder listings stored on disk by previous runs.
+
+        Returns:
+        - dict: The cached file IDs and folder listings.
+
+        """
+        try:
+            with open(self.CACHE_PATH, 'rb') as cache_file:
+                return orjson.loads(cache_file.read())
+        except (OSError, ValueError):
+            return {'files': {}, 'folders': {}}
+
+    def _save_cache(self) -> None:
+        """
+        Stores the file IDs and folder listings on disk, to be reused by the next runs. Expired entries are evicted, as well as the
+        listings expiring first when there are more than CACHE_MAX_FOLDERS of them.
+
+        """
+        if not self._cache_dirty:
+            return
+
+        now = time.time()
+        for entries in self._cache.values():
+            for key in [key for key, entry in entries.items() if entry.get('expires', 0) < now]:
+                del entries[key]
+        folders = self._cache['folders']
+        if len(folders) > self.CACHE_MAX_FOLDERS:
+            kept_urls = sorted(folders, key=lambda url: folders[url]['expires'])[-self.CACHE_MAX_FOLDERS:]
+            self._cache['folders'] = {url: folders[url] for url in kept_urls}
+
+        # The cache is an optimization only, so a location that cannot be written does not stop the download.
+        try:
+            os.makedirs(os.path.dirname(self.CACHE_PATH), exist_ok=True)
+            temporary_path = self.CACHE_PATH + '.tmp'
+            # The cache reveals the structure of the site, so only the current user may read it.
+            with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as cache_file:
+                cache_file.write(orjson.dumps(self._cache))
+            os.chmod(temporary_path, 0o600)
+            os.replace(temporary_path, self.CACHE_PATH)
+            self._cache_dirty = False
+        except OSError:
+            pass
+
+    def _get_cached_file(self, cache_key: str):
+        """
+        Retrieves the metadata of a file found on a previous run, if its cache entry is still valid.
+
+        Args:
+        - cache_key (str): The key identifying the site, folder and file name searched.
+
+        Returns:
+        - tuple: The drive ID and a tuple with the ID, Download URL and name of the file, or (None, None) when the file is not cached or no longer exists.
+
+        """
+        cached_file = self._cache['files'].get(cache_key)
+        if not cached_file or cached_file['expires'] < time.time():
+            return None, None
+
+        file_response = self._get(f"{self.url}/{cached_file['drive_id']}/items/{cached_file['file_id']}")
+        if file_response.status_code in (404, 410):
+            del self._cache['files'][cache_key]
+            self._cache_dirty = True
+            return None, None
+        file_response.raise_for_status()
+        file_result = orjson.loads(file_response.content)
+        return cached_file['drive_id'], (file_result['id'], file_result['@microsoft.graph.downloadUrl'], file_result['name'])
+
+    def _list_pages(self, url: str):
+        """
+        Yields the items of a collection from the API, following the next links of its pages.
+
+        Args:
+        - url (str): The URL of the collection's first page.
+
+        Yields:
+        - dict: Each item of the collection.
+
+        """
+        while url:
+            response = self._get(url)
+            response.raise_for_status()
+            result_json = orjson.loads(response.content)
+            yield from result_json.get('value', [])
+            url = result_json.get('@odata.nextLink')
+
+    @staticmethod
+    def _odata_string(value: str) -> str:
+        """
+        Escapes a value to be used as a string literal in an OData query, doubling its single quotes and encoding it for the URL.
+
+        """
+        return quote(value.replace("'", "''"))
+
     def get_response_id(self, result_json, folder_match: str):
         """
         Retrieves the ID for the specified folder or file.
 
         Args:
-        - result_json (str): The JSON response containing folder/file information.
+        - result_json (str): The JSON response containing folder/file information, already filtered by name on the server.
         - folder_match (str): The name of the folder/file to be matched.
 
         Returns:
@@ -105,13 +341,11 @@ class SharepointDownloader():
         """
         try:
             # Converting the response into JSON format
-            result_json = json.loads(result_json.content)
+            result_json = orjson.loads(result_json.content)
             
-            # Verifying the id for the object
-            for item in result_json['value']:
-                if item['name'] == folder_match:
-                    return item['id']
-            return None
+            # Verifying the id for the object. The server filters the items by name, usually leaving a single one, but its
+            # comparison ignores case (and the filter may be ignored), so the name is still matched exactly.
+            return next((item['id'] for item in result_json['value'] if item['name'] == folder_match), None)
         
         except Exception as e:
             raise RuntimeError(f'Erro ao baixar arquivo: {e}')
@@ -128,10 +362,14 @@ class SharepointDownloader():
 
         """
         try:
-            headers = self.get_token()
-            response = requests.get(self.url, headers=headers)
-            drive_id = self.get_response_id(result_json=response, folder_match='Documents')
-            drive_response = requests.get(self.url + f'{drive_id}/root/children', headers=headers)
+            # The default document library is requested directly, only once per object.
+            if not self._default_drive_id:
+                drive_response = self._get(f'https://graph.microsoft.com/v1.0/sites/{self.SHAREPOINT_SITE_ID}/drive?$select=id')
+                drive_response.raise_for_status()
+                self._default_drive_id = orjson.loads(drive_response.content)['id']
+            drive_id = self._default_drive_id
+            drive_response = self._get(self.url + f"{drive_id}/root/children?$select=id,name,folder&$filter=name eq '{self._odata_string(folder_match)}'")
+            drive_response.raise_for_status()
             root_folder_id = self.get_response_id(result_json=drive_response, folder_match=folder_match)
             
             return drive_id, root_folder_id
@@ -139,42 +377,268 @@ class SharepointDownloader():
         except Exception as e:
             raise RuntimeError(f'Erro ao baixar arquivo: {e}')
 
-    def find_file(self, drive_id: str, folder_id: str, target_file_name: str, headers):
+    @staticmethod
+    def _retry_after(value) -> int:
+        """
+        Converts a Retry-After header into seconds, waiting 1 second when it is missing or given as an HTTP date.
+
+        """
+        try:
+            return max(int(value), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def _list_folders(self, items_base: str, folder_ids: list):
+        """
+        Lists the children of up to 20 folders in a single Graph $batch request.
+
+        Args:
+        - items_base (str): The relative URL of the drive items, to which each folder ID is appended.
+        - folder_ids (list): The IDs of the folders to be listed.
+
+        Returns:
+        - tuple: The listed items by folder ID, the cache entries to be stored by listing URL, the folder IDs throttled or unavailable on the API
+        and the seconds to wait before retrying them. The cache is left untouched, as this runs on the worker threads of find_file.
+
+        """
+        # The listings are cached by their whole URL, so a change of drive or query never serves a listing with other fields.
+        listing_urls = [items_base + folder_id + self.CHILDREN_QUERY for folder_id in folder_ids]
+
+        batch_body, cached_listings = {'requests': []}, {}
+        for index, listing_url in enumerate(listing_urls):
+            request = {'id': str(index), 'method': 'GET', 'url': listing_url}
+
+            # Listings cached from a previous run are validated by their ETag, so unchanged folders come back as an empty 304.
+            cached_listing = self._cache['folders'].get(listing_url)
+            if cached_listing and cached_listing['expires'] > time.time():
+                cached_listings[listing_url] = cached_listing
+                request['headers'] = {'If-None-Match': cached_listing['etag']}
+            batch_body['requests'].append(request)
+
+        batch_response = self._post(self.batch_url, headers={'Content-Type': 'application/json'}, data=orjson.dumps(batch_body))
+        batch_response.raise_for_status()
+
+        listings, cache_updates, throttled, retry_after = {}, {}, [], 0
+        for response in orjson.loads(batch_response.content)['responses']:
+            folder_id = folder_ids[int(response['id'])]
+            listing_url = listing_urls[int(response['id'])]
+            status = response['status']
+            if status in self.RETRY_STATUSES:
+                throttled.append(folder_id)
+                retry_after = max(retry_after, self._retry_after(response.get('headers', {}).get('Retry-After')))
+            elif status == 304:
+                listings[folder_id] = cached_listings[listing_url]['value']
+                cache_updates[listing_url] = dict(cached_listings[listing_url], expires=time.time() + self.CACHE_TTL)
+            elif status != 200:
+                # Any other failure is raised, as skipping the folder would silently drop its whole subtree from the search.
+                raise RuntimeError(f"Erro ao listar a pasta {folder_id}: {status} {response.get('body', {}).get('error', {}).get('message', '')}")
+            else:
+                # Folders with more items than a single page are completed by following their next links.
+                listings[folder_id] = response['body'].get('value', [])
+                next_link = response['body'].get('@odata.nextLink')
+                if next_link:
+                    listings[folder_id].extend(self._list_pages(next_link))
+                etag = response.get('headers', {}).get('ETag')
+                if etag:
+                    # The Download URLs are pre-authenticated, so they are never written to disk.
+                    cached_items = [{key: value for key, value in item.items() if key != '@microsoft.graph.downloadUrl'} for item in listings[folder_id]]
+                    cache_updates[listing_url] = {'etag': etag, 'value': cached_items, 'expires': time.time() + self.CACHE_TTL}
+
+        return listings, cache_updates, throttled, retry_after
+
+    def find_file(self, drive_id: str, folder_id: str, target_file_name: str):
         """
         Searches for the specified file within the SharePoint folders.
 
+        The folders are visited level by level: every pending folder is split into $batch requests of up to 20 listings, which are sent concurrently.
+
         Args:
         - drive_id (str): The ID of the root folder on the API.
         - folder_id (str): The ID of the folder to search within.
         - target_file_name (str): The name of the file to be searched.
-        - headers (dict): The authorization headers for the request.
 
         Returns:
-        - str: The ID of the matching file.
+        - tuple: The ID, Download URL (None when it is not returned by the API or the cache) and name of the matching file.
 
         """
+        executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
         try:
-            # Requests to search the file ID.
-            folder_url = f"{self.url}/{drive_id}/items/{folder_id}/children"
-            folder_response = requests.get(folder_url, headers=headers)
-            folder_result = folder_response.json()
-            
-            # This loops looks for the Download URL. If do not finds the file in the loop, it looks inside each folder.
-            for item in folder_result['value']:
-                if '@microsoft.graph.downloadUrl' in item:  # Verifica se é um arquivo
-                    if item['name'] == target_file_name:
-                        return item['id']
-                else:
-                    if 'folder' in item:
-                        sub_folder_id = item['id']
-                        file_id = self.find_file(drive_id, sub_folder_id, target_file_name, headers)
-                        if file_id:
-                            return file_id
+            items_base = f'/sites/{self.SHAREPOINT_SITE_ID}/drives/{drive_id}/items/'
+            pending_folders = deque([folder_id])
+            retries = {}
+
+            while pending_folders:
+                # Fans out the pending folders over concurrent $batch requests.
+                futures = []
+                while pending_folders and len(futures) < self.MAX_WORKERS:
+                    folder_ids = [pending_folders.popleft() for _ in range(min(self.BATCH_SIZE, len(pending_folders)))]
+                    futures.append(executor.submit(self._list_folders, items_base, folder_ids))
+
+                # Throttled folders are queued again and the next round waits for the longest Retry-After.
+                retry_after = 0
+                for future in as_completed(futures):
+                    listings, cache_updates, throttled, wait = future.result()
+
+                    # A folder that keeps being throttled or unavailable stops the search instead of retrying it forever.
+                    for throttled_folder_id in throttled:
+                        retries[throttled_folder_id] = retries.get(throttled_folder_id, 0) + 1
+                        if retries[throttled_folder_id] > self.MAX_RETRIES:
+                            raise RuntimeError(f'Erro ao listar a pasta {throttled_folder_id}: indisponível após {self.MAX_RETRIES} tentativas')
+                    pending_folders.extend(throttled)
+
+                    # The cache is only written here, on the calling thread, so siblings still running after a match never touch it.
+                    if cache_updates:
+                        self._cache['folders'].update(cache_updates)
+                        self._cache_dirty = True
+                    retry_after = max(retry_after, wait)
+
+                    # This loops looks for the Download URL. If do not finds the file in the listing, it queues each folder.
+                    for items in listings.values():
+                        for item in items:
+                            if 'file' in item:  # Verifica se é um arquivo
+                                if item['name'] == target_file_name:
+                                    return item['id'], item.get('@microsoft.graph.downloadUrl'), item['name']
+                            elif 'folder' in item:
+                                pending_folders.append(item['id'])
+
+                if retry_after:
+                    time.sleep(retry_after)
+            return None
+        
+        except Exception as e:
+            raise RuntimeError(f'Erro ao baixar arquivo: {e}')
+
+        finally:
+            # Siblings still waiting to run are cancelled once the file is found, and the results of the running ones are discarded.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def find_file_by_search(self, drive_id: str, target_file_name: str, folder_scope_id: str = None, folder_match: str = None):
+        """
+        Searches for the specified file with the Graph search endpoint, which finds it on the server side in a single request.
+
+        Args:
+        - drive_id (str): The ID of the root folder on the API.
+        - target_file_name (str): The name of the file to be searched.
+        - folder_scope_id (str): The ID of the folder to search within. The whole drive is searched when it is not set.
+        - folder_match (str): The name of a folder that must be part of the file's path, when the whole drive is searched.
+
+        Returns:
+        - tuple: The ID, Download URL (None when it is not returned by the API or the cache) and name of the matching file.
+
+        """
+        try:
+            scope = f'items/{folder_scope_id}' if folder_scope_id else 'root'
+            search_url = self.url + f"{drive_id}/{scope}/search(q='{self._odata_string(target_file_name)}')?$select=id,name,file,parentReference,@microsoft.graph.downloadUrl"
+
+            # The search is a full-text one, so only the exact file names are kept. A scoped search is already limited to its folder,
+            # while a drive-wide one keeps the files with the matched folder among the segments of their path (like '/drives/{id}/root:/Folder/Sub').
+            for item in self._list_pages(search_url):
+                if item['name'] != target_file_name or 'file' not in item:
+                    continue
+                if not folder_scope_id and folder_match:
+                    parent_path = unquote(item.get('parentReference', {}).get('path', ''))
+                    if folder_match not in parent_path.split(':', 1)[-1].split('/'):
+                        continue
+                return item['id'], item.get('@microsoft.graph.downloadUrl'), item['name']
             return None
         
         except Exception as e:
             raise RuntimeError(f'Erro ao baixar arquivo: {e}')
 
+    def _write_response(self, response, file_name: str, offset: int = None) -> int:
+        """
+        Writes the body of a streamed response to disk, chunk by chunk.
+
+        Args:
+        - response (requests.Response): The streamed response.
+        - file_name (str): The file to be written.
+        - offset (int): The position where the body is written inside an existing file. The file is created when it is not set.
+
+        Returns:
+        - int: The number of bytes written.
+
+        """
+        with open(file_name, 'wb' if offset is None else 'r+b', buffering=self.CHUNK_SIZE) as downloaded_file:
+            if offset is not None:
+                downloaded_file.seek(offset)
+            written = 0
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                written += downloaded_file.write(chunk)
+        return written
+
+    def _download_ranges(self, file_download_url: str, file_name: str, file_size: int) -> bool:
+        """
+        Downloads the file as byte ranges requested concurrently, each one written at its position in a pre-sized file.
+
+        Args:
+        - file_download_url (str): The Download URL of the file.
+        - file_name (str): The file to be written.
+        - file_size (int): The size of the file in bytes.
+
+        Returns:
+        - bool: False when the server ignored the ranges, so the file must be downloaded in a single request.
+
+        """
+        range_size = -(-file_size // self.DOWNLOAD_WORKERS)
+        byte_ranges = [(start, min(start + range_size, file_size) - 1) for start in range(0, file_size, range_size)]
+        with open(file_name, 'wb') as downloaded_file:
+            downloaded_file.truncate(file_size)
+
+        def download_range(byte_range):
+            start, end = byte_range
+            headers = {'Range': f'bytes={start}-{end}', 'Accept-Encoding': 'identity'}
+            with self.session.get(file_download_url, headers=headers, stream=True, timeout=self.REQUEST_TIMEOUT) as range_response:
+                range_response.raise_for_status()
+                if range_response.status_code != 206:
+                    return False
+
+                # The file is pre-sized, so a range that is different or cut short would leave a zero-filled gap inside it.
+                content_range = range_response.headers.get('Content-Range', '')
+                if not content_range.startswith(f'bytes {start}-{end}/'):
+                    raise RuntimeError(f'Faixa de bytes inesperada: {content_range!r} em vez de bytes {start}-{end}')
+                written = self._write_response(range_response, file_name, offset=start)
+                if written != end - start + 1:
+                    raise RuntimeError(f'Faixa de bytes {start}-{end} incompleta: {written} de {end - start + 1} bytes')
+            return True
+
+        with ThreadPoolExecutor(max_workers=self.DOWNLOAD_WORKERS) as executor:
+            return all(executor.map(download_range, byte_ranges))
+
+    def _save_download(self, download_response, file_download_url: str, file_name: str) -> None:
+        """
+        Saves the downloaded file to disk. Large files are split in byte ranges downloaded concurrently.
+
+        Args:
+        - download_response (requests.Response): The streamed response of the Download URL.
+        - file_download_url (str): The Download URL of the file.
+        - file_name (str): The file to be written.
+
+        """
+        # The file is written under a temporary name and only renamed once complete, so a failed download never leaves a partial
+        # (or, for the byte ranges, pre-sized and zero-filled) file that looks valid.
+        temporary_path = file_name + '.part'
+        try:
+            # The download URL is pre-authenticated, so it is streamed through the session without the authorization header.
+            with download_response:
+                download_response.raise_for_status()
+                file_size = int(download_response.headers.get('Content-Length', 0))
+                use_ranges = download_response.headers.get('Accept-Ranges') == 'bytes' and file_size >= self.RANGE_DOWNLOAD_MIN_SIZE
+                if not use_ranges:
+                    self._write_response(download_response, temporary_path)
+
+            # The single response is closed unread, and requested again only if the server does not honor the ranges.
+            if use_ranges and not self._download_ranges(file_download_url, temporary_path, file_size):
+                with self.session.get(file_download_url, headers={'Accept-Encoding': 'identity'}, stream=True, timeout=self.REQUEST_TIMEOUT) as download_response:
+                    download_response.raise_for_status()
+                    self._write_response(download_response, temporary_path)
+
+            os.replace(temporary_path, file_name)
+
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
     def download_file(self, target_file_name: str, folder_match: str):
         """
         Downloads the specified file from SharePoint.
@@ -185,17 +649,41 @@ class SharepointDownloader():
 
         """
         try:
-            # Getting each important ID to download the file
-            headers = self.get_token()
-            drive_id, root_folder_id = self.get_drive_id(folder_match)
-            file_id = self.find_file(drive_id, root_folder_id, target_file_name, headers)
+            # A file found on a previous run is requested directly, skipping the whole search.
+            cache_key = f'{self.SHAREPOINT_SITE_ID}|{folder_match}|{target_file_name}'
+            drive_id, file_result = self._get_cached_file(cache_key)
+
+            if not file_result:
+                # Getting each important ID to download the file
+                drive_id, root_folder_id = self.get_drive_id(folder_match)
+
+                # Without the matched folder there is nowhere to search, so the file is reported as not found.
+                if root_folder_id:
+                    file_result = self.find_file_by_search(drive_id, target_file_name, root_folder_id, folder_match)
+
+                    # The folders are walked only when the search does not return the file, as the index may not be up to date.
+                    if not file_result:
+                        file_result = self.find_file(drive_id, root_folder_id, target_file_name)
+
+                if file_result:
+                    self._cache['files'][cache_key] = {'drive_id': drive_id, 'file_id': file_result[0], 'expires': time.time() + self.CACHE_TTL}
+                    self._cache_dirty = True
+                self._save_cache()
             
-            # Requests the Download URL from the API and downloads it within the system set up.
-            if file_id:
-                file_url = f"{self.url}/{drive_id}/items/{file_id}"
-                file_result = requests.get(file_url, headers=headers).json()
-                file_download_url = file_result["@microsoft.graph.downloadUrl"]
-                urlretrieve(file_download_url, file_result['name'])
+            # Downloads the file within the system set up, using the Download URL returned along with its ID.
+            if file_result:
+                file_id, file_download_url, file_name = file_result
+
+                # The download URL is short-lived, so it is requested again when missing or already expired (as in a cached folder listing).
+                download_response = self.session.get(file_download_url, headers={'Accept-Encoding': 'identity'}, stream=True, timeout=self.REQUEST_TIMEOUT) if file_download_url else None
+                if download_response is None or download_response.status_code in (401, 403):
+                    if download_response is not None:
+                        download_response.close()
+                    file_url = f"{self.url}/{drive_id}/items/{file_id}"
+                    file_download_url = orjson.loads(self._get(file_url).content)["@microsoft.graph.downloadUrl"]
+                    download_response = self.session.get(file_download_url, headers={'Accept-Encoding': 'identity'}, stream=True, timeout=self.REQUEST_TIMEOUT)
+
+                self._save_download(download_response, file_download_url, file_name)
                 print("Arquivo baixado com sucesso!")
             else:
                 print("Arquivo não encontrado.")